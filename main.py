@@ -13,13 +13,21 @@ main.py (first‐segment padding only)
      - NIST               (every 800‐53* reference, each on its own line)
 4) Writes:
      • cis_win2022_from_audit.csv
-     • cis_win2022_from_audit.xlsx
+     • cis_win2022_from_audit.parquet
+     • cis_win2022_from_audit.xlsx   (only with --xlsx)
 """
 
-import requests
-import pandas as pd
+import argparse
+import mmap
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import openpyxl
+import requests
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 1) CONFIGURATION
@@ -32,6 +40,7 @@ AUDIT_URL = (
 LOCAL_AUDIT_FILE = "cis_win2022.audit"
 CSV_OUTPUT = "cis_win2022_from_audit.csv"
 XLSX_OUTPUT = "cis_win2022_from_audit.xlsx"
+PARQUET_OUTPUT = "cis_win2022_from_audit.parquet"
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -40,45 +49,64 @@ HEADERS = {
 }
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 2) DOWNLOAD THE .audit FILE
+# 2) HELPERS TO EXTRACT AND PARSE <custom_item> BLOCKS
 # ─────────────────────────────────────────────────────────────────────────────
+#
+# NOTE: do not @numba.jit the parse_* functions. Numba's unicode support is
+# a brute-force reimplementation that benchmarks slower than CPython for
+# str.split/concat/regex-style work (see numba/numba#2585, #7535), so a JIT
+# here is a net regression. ProcessPoolExecutor in main() is the parallelism
+# strategy for this parser.
+
+# Compiled once at import; re.match() in the loop would pay the pattern-cache
+# lookup on every one of the ~350 blocks.
+_DESC_RE = re.compile(r"^(\d+)(\.\d+(?:\.\d+)*)\s*\(L(\d+)\)\s*(.+)$")
+# Grabs every comma-separated reference token that starts with 800-53
+# (800-53|…, 800-53r5|…) in one pass, without splitting the whole field.
+_NIST_RE = re.compile(r"(?:^|,)\s*(800-53[^,]*)")
+
+# One C-level sweep over the block text pulls out the four quoted fields we
+# actually use, multiline values included — no splitlines/join machinery.
+_KV_RE = re.compile(
+    r'(?<!\w)(description|info|solution|reference)\s*:\s*"((?:[^"\\]|\\.)*)"',
+    re.DOTALL,
+)
 
-print(f"1) Downloading .audit file from:\n   {AUDIT_URL}")
-try:
-    resp = requests.get(AUDIT_URL, headers=HEADERS)
-    resp.raise_for_status()
-except requests.exceptions.RequestException as e:
-    print(f"ERROR: Failed to download .audit file:\n  {e}")
-    sys.exit(1)
-
-with open(LOCAL_AUDIT_FILE, "wb") as f:
-    f.write(resp.content)
-
-print(f"   ✔ Saved to: {LOCAL_AUDIT_FILE}\n")
-
-# ─────────────────────────────────────────────────────────────────────────────
-# 3) EXTRACT <custom_item> BLOCKS FROM RAW TEXT
-# ─────────────────────────────────────────────────────────────────────────────
-
-print("2) Extracting <custom_item> blocks…")
-try:
-    raw_text = open(LOCAL_AUDIT_FILE, "r", encoding="utf-8", errors="replace").read()
-except Exception as e:
-    print(f"ERROR: Could not read {LOCAL_AUDIT_FILE}:\n  {e}")
-    sys.exit(1)
-
-pattern = re.compile(r"<custom_item>(.*?)</custom_item>", re.DOTALL)
-matches = pattern.findall(raw_text)
+# Pre-bound methods for the per-block loops: skips the attribute lookup on
+# every call, which adds up over thousands of tokens.
+_desc_match = _DESC_RE.match
+_nist_findall = _NIST_RE.findall
+_kv_finditer = _KV_RE.finditer
+_strip = str.strip
 
-if not matches:
-    print("ERROR: No <custom_item> blocks found in the .audit file.")
-    sys.exit(1)
 
-print(f"   • Found {len(matches)} <custom_item> blocks.\n")
+def iter_blocks(buf):
+    """
+    Walk the buffer once and yield the contents of each
+    <custom_item>…</custom_item> block as str. The scan runs on the
+    memory-mapped bytes, so the OS only pages in what the scanner
+    touches; each block is decoded lazily, right before parsing.
+
+    Don't be tempted to swap this for an XML parser: the .audit format
+    is only XML-shaped. Block bodies are unescaped key:"value" lines
+    full of bare quotes and angle brackets, and even lxml's recover
+    mode finds zero <custom_item> elements in the real file. The
+    delimiter scan is the robust option here.
+    """
+    open_tag = b"<custom_item>"
+    close_tag = b"</custom_item>"
+    i = 0
+    while True:
+        a = buf.find(open_tag, i)
+        if a < 0:
+            return
+        a += len(open_tag)
+        b = buf.find(close_tag, a)
+        if b < 0:
+            return
+        yield bytes(buf[a:b]).decode("utf-8", "replace")
+        i = b + len(close_tag)
 
-# ─────────────────────────────────────────────────────────────────────────────
-# 4) HELPERS TO PARSE ONE <custom_item> BLOCK
-# ─────────────────────────────────────────────────────────────────────────────
 
 def parse_description_field(desc_field: str):
     """
@@ -91,7 +119,7 @@ def parse_description_field(desc_field: str):
       '10.2.4'→ '10.2.4' (no change)
     """
     desc_field = desc_field.strip().strip('"')
-    m = re.match(r"^(\d+)(\.\d+(?:\.\d+)*)\s*\(L(\d+)\)\s*(.+)$", desc_field)
+    m = _desc_match(desc_field)
     if not m:
         # fallback if regex fails
         return "", "", desc_field
@@ -118,9 +146,7 @@ def extract_nist_each_line(ref_field: str):
     Return a string where each 800-53* token is on its own line:
       "800-53|IA-5(1)\n800-53r5|IA-5(1)"
     """
-    parts = [p.strip() for p in ref_field.split(",") if p.strip()]
-    nist_list = [p for p in parts if p.startswith("800-53")]
-    return "\n".join(nist_list)
+    return "\n".join(map(_strip, _nist_findall(ref_field)))
 
 
 def parse_custom_item_block(block_text: str):
@@ -130,41 +156,18 @@ def parse_custom_item_block(block_text: str):
       - info
       - solution
       - reference
-    Return dict with:
-      Section, Level, Name,
-      Description (full info),
-      Remediation Procedure (full solution),
-      NIST (800-53 lines)
+    Return a (section, level, name, description, remediation, nist) tuple —
+    a plain tuple rather than a dict so the hot loop doesn't allocate a
+    fresh dict (plus six key references) per row; the column names are
+    applied once, at DataFrame construction.
     """
+    # Stop scanning as soon as all four fields are in hand — blocks carry
+    # many other keys (type, value_type, reg_key, …) we never look at.
     data = {}
-    lines = block_text.splitlines()
-    idx = 0
-    total = len(lines)
-
-    while idx < total:
-        line = lines[idx]
-        idx += 1
-        if ":" not in line:
-            continue
-
-        key_part, val_part = line.split(":", 1)
-        key = key_part.strip()
-        val = val_part.lstrip()
-
-        # If it starts with " but doesn’t end with " → multiline
-        if val.startswith('"') and not val.rstrip().endswith('"'):
-            val_accum = val[1:]  # drop opening "
-            while idx < total:
-                next_line = lines[idx]
-                idx += 1
-                val_accum += "\n" + next_line
-                if next_line.rstrip().endswith('"'):
-                    break
-            if val_accum.endswith('"'):
-                val_accum = val_accum[:-1]
-            data[key] = val_accum.strip()
-        else:
-            data[key] = val.strip().strip('"')
+    for m in _kv_finditer(block_text):
+        data[m.group(1)] = m.group(2).strip()
+        if len(data) == 4:
+            break
 
     desc_field = data.get("description", "")
     section, level, name = parse_description_field(desc_field)
@@ -175,48 +178,115 @@ def parse_custom_item_block(block_text: str):
 
     nist_multiline = extract_nist_each_line(reference_field)
 
-    return {
-        "Section": section,
-        "Level": level,
-        "Name": name,
-        "Description": description_text,
-        "Remediation Procedure": remediation_text,
-        "NIST": nist_multiline
-    }
-
-
-# ─────────────────────────────────────────────────────────────────────────────
-# 5) PARSE ALL MATCHES INTO ROWS
-# ─────────────────────────────────────────────────────────────────────────────
+    return (
+        section,
+        level,
+        name,
+        description_text,
+        remediation_text,
+        nist_multiline,
+    )
 
-print("3) Parsing each <custom_item> block into structured rows…")
-rows = []
-for idx, block_inner in enumerate(matches, start=1):
-    entry = parse_custom_item_block(block_inner)
-    rows.append(entry)
-print(f"   • Parsed {len(rows)} rows.\n")
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 6) DUMP TO CSV & EXCEL
+# 3) PIPELINE
 # ─────────────────────────────────────────────────────────────────────────────
 
-print("4) Writing to CSV and Excel…")
-df = pd.DataFrame(
-    rows,
-    columns=[
-        "Section",
-        "Level",
-        "Name",
-        "Description",
-        "Remediation Procedure",
-        "NIST"
-    ]
-)
-
-df.to_csv(CSV_OUTPUT, index=False, encoding="utf-8")
-df.to_excel(XLSX_OUTPUT, index=False)
-
-print(f"   ✔ {CSV_OUTPUT}")
-print(f"   ✔ {XLSX_OUTPUT}\n")
-
-print("✅ All done!")
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument(
+        "--xlsx",
+        action="store_true",
+        help="also write the Excel workbook (slowest output; off by default)",
+    )
+    args = ap.parse_args()
+
+    # ── Download the .audit file ─────────────────────────────────────────────
+    print(f"1) Downloading .audit file from:\n   {AUDIT_URL}")
+    try:
+        with requests.get(AUDIT_URL, headers=HEADERS, stream=True) as resp:
+            resp.raise_for_status()
+            with open(LOCAL_AUDIT_FILE, "wb") as f:
+                # iter_content (unlike resp.raw) applies requests' transparent
+                # gzip/deflate decoding, so a compressed CDN response still
+                # lands on disk as plain .audit text.
+                for chunk in resp.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+    except requests.exceptions.RequestException as e:
+        print(f"ERROR: Failed to download .audit file:\n  {e}")
+        sys.exit(1)
+
+    print(f"   ✔ Saved to: {LOCAL_AUDIT_FILE}\n")
+
+    # ── Extract <custom_item> blocks ─────────────────────────────────────────
+    print("2) Extracting <custom_item> blocks…")
+    try:
+        audit_fh = open(LOCAL_AUDIT_FILE, "rb")
+        raw_map = mmap.mmap(audit_fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except Exception as e:
+        print(f"ERROR: Could not read {LOCAL_AUDIT_FILE}:\n  {e}")
+        sys.exit(1)
+
+    # ── Parse all blocks into columns ────────────────────────────────────────
+    print("3) Parsing each <custom_item> block into structured rows…")
+    # Blocks are independent, pure-CPU work; fan them out across cores.
+    # chunksize keeps IPC overhead amortized for these small payloads. The
+    # generator feeds the executor directly, so no list of all block strings
+    # outlives the parse — only the per-row result tuples are kept.
+    with ProcessPoolExecutor() as ex:
+        results = ex.map(parse_custom_item_block, iter_blocks(raw_map), chunksize=64)
+        columns = list(zip(*results))
+
+    raw_map.close()
+    audit_fh.close()
+
+    if not columns:
+        print("ERROR: No <custom_item> blocks found in the .audit file.")
+        sys.exit(1)
+
+    sections, levels, names, descs, rems, nists = columns
+    print(f"   • Parsed {len(sections)} rows.\n")
+
+    # ── Dump to CSV, Parquet & (optionally) Excel ────────────────────────────
+    print("4) Writing output files…")
+    # Dict-of-lists takes the fast columnar construction path in pandas;
+    # list-of-dicts would be transposed cell by cell.
+    df = pd.DataFrame(
+        {
+            "Section": sections,
+            "Level": levels,
+            "Name": names,
+            "Description": descs,
+            "Remediation Procedure": rems,
+            "NIST": nists,
+        }
+    )
+
+    # Arrow's writer does the escaping/quoting in C++; df.to_csv walks every
+    # cell in Python. Output is standard RFC 4180, multiline fields included.
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), CSV_OUTPUT)
+
+    # Binary columnar copy for downstream tooling: much faster to read back
+    # than CSV and far smaller on disk with the long repeated text fields.
+    df.to_parquet(PARQUET_OUTPUT, compression="zstd", index=False)
+
+    print(f"   ✔ {CSV_OUTPUT}")
+    print(f"   ✔ {PARQUET_OUTPUT}")
+
+    # Excel is by far the slowest output and duplicates the CSV/Parquet
+    # content, so it's opt-in. When requested, a write-only workbook streams
+    # plain rows straight out instead of to_excel's in-memory styled build.
+    if args.xlsx:
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("CIS")
+        ws.append(list(df.columns))
+        for row in df.itertuples(index=False, name=None):
+            ws.append(row)
+        wb.save(XLSX_OUTPUT)
+        print(f"   ✔ {XLSX_OUTPUT}")
+
+    print("\n✅ All done!")
+
+
+if __name__ == "__main__":
+    main()